@@ -1,6 +1,7 @@
 import streamlit as st
 import os
 import pandas as pd
+from app_utils import get_memory_metrics
 
 # Page config
 st.set_page_config(page_title="Personal Finance Assistant", page_icon="📝", layout="centered")
@@ -28,4 +29,12 @@ with col2:
         # Overwrite budget.csv
         budget_headers = ["Category", "Amount"]  # Adjust to your actual headers
         pd.DataFrame(columns=budget_headers).to_csv("data/budget.csv", index=False)
-        st.switch_page("pages/1_Input_Transactions.py")
\ No newline at end of file
+        st.switch_page("pages/1_Input_Transactions.py")
+
+with st.expander("🧠 Memory Usage"):
+    metrics = get_memory_metrics()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Per Session", f"{metrics['resident_bytes_per_session'] / 1024:,.1f} KB")
+    col2.metric("Session State", f"{metrics['session_state_bytes'] / 1024:,.1f} KB")
+    col3.metric("Shared Data", f"{metrics['shared_bytes'] / 1024:,.1f} KB")
+    st.caption(f"{metrics['active_sessions']} active session(s) sharing {metrics['shared_versions']} data version(s)")
@@ -1,21 +1,138 @@
 import sys
 import os
+import re
+import threading
+import weakref
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
 import pandas as pd
-# Removed unused imports: requests, re, pipeline, json, plt
+
+# Copy-on-write keeps shallow copies of the shared frames independent (always on from pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+# Removed unused imports: requests, pipeline, json, plt
 
 # Data Directory
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 os.makedirs(DATA_DIR, exist_ok=True)
 transactions_data = os.path.join(DATA_DIR, "transactions.csv")
+exchange_rates_data = os.path.join(DATA_DIR, "exchange_rates.csv")
 expected_cols = [
     "Date", "Description", "Amount", "Category",
-    "Subcategory", "Payment Method", "Note"
+    "Subcategory", "Payment Method", "Note", "Currency"
 ]
 
+# Money is kept as int64 minor units (e.g. sen, cents) with an explicit currency
+CURRENCY = "IDR"
+CURRENCY_EXPONENTS = {"IDR": 0, "USD": 2, "EUR": 2, "SGD": 2, "JPY": 0}
+CURRENCY_SYMBOLS = {"IDR": "Rp", "USD": "$", "EUR": "€", "SGD": "S$", "JPY": "¥"}
+# Columns that may be left out of the CSV, with the value used to fill them
+optional_cols = {"Currency": CURRENCY}
+# Decimal places read from text amounts; one more than any exponent, so rounding stays exact
+PARSE_SCALE = 4
+# Accepted amount text once the currency symbol and whitespace are removed, e.g. "1,650,000.50" or "-12.5"
+MONEY_PATTERN = r"-?\d{1,3}(?:,\d{3})*(?:\.\d+)?|-?\d+(?:\.\d+)?"
+# Largest integer part that still fits in int64 once scaled by 10 ** PARSE_SCALE
+MAX_MAJOR_DIGITS = str((2 ** 63 - 1) // 10 ** PARSE_SCALE - 1)
+
+# Function to get the minor-unit exponent for one currency or a column of currencies
+def currency_exponent(currency=CURRENCY):
+    if isinstance(currency, pd.Series):
+        return currency.map(CURRENCY_EXPONENTS).fillna(2).astype("int64")
+    return CURRENCY_EXPONENTS.get(currency, 2)
+
+# Function to clean a currency column (blank or missing values fall back to the default)
+def normalize_currency(values):
+    currency = pd.Series(values).fillna("").astype(str).str.strip().str.upper()
+    return currency.where(currency != "", CURRENCY)
+
+# Function to parse amounts (text or numbers, major units) into minor units; NA where the amount is not valid
+def to_minor_units(values, currency=CURRENCY):
+    if pd.api.types.is_scalar(values):
+        amount = to_minor_units(pd.Series([values], dtype=object), currency).iloc[0]
+        return None if pd.isna(amount) else int(amount)
+    series = pd.Series(values)
+    exponent = currency_exponent(currency)
+    if pd.api.types.is_bool_dtype(series):
+        return pd.Series(pd.NA, index=series.index, dtype="Int64")
+    if pd.api.types.is_integer_dtype(series):
+        series = series.astype("Int64")
+        in_range = series.abs() <= (2 ** 63 - 1) // 10 ** exponent
+        return (series.where(in_range, 0) * 10 ** exponent).where(in_range, pd.NA)
+    if pd.api.types.is_float_dtype(series):
+        # repr is the shortest text that round-trips, so 1.005 is parsed as exactly 1.005
+        # (scientific notation such as 1e+16 doesn't match MONEY_PATTERN and becomes NA)
+        series = series.map(repr, na_action="ignore")
+    # Exact decimal parsing on the whole column: only whitespace and the row's own currency symbol/code are
+    # dropped, so an amount written in another currency ("USD 12.50" in an IDR row) doesn't match and is NA
+    text = series.astype("string").str.replace(r"\s+", "", regex=True)
+    currencies = currency if isinstance(currency, pd.Series) else pd.Series(currency, index=series.index)
+    for code in currencies.dropna().unique():
+        rows = currencies == code
+        tokens = "|".join(re.escape(token) for token in sorted({code, currency_symbol(code)}, key=len, reverse=True))
+        text[rows] = text[rows].str.replace(f"^(?:{tokens})|(?:{tokens})$", "", regex=True, case=False)
+    valid = text.str.fullmatch(MONEY_PATTERN).fillna(False).astype(bool)
+    parts = text.where(valid, "0").str.replace(",", "", regex=False).str.extract(r"^(?P<sign>-?)(?P<major>\d+)(?:\.(?P<minor>\d+))?$")
+    # Integer parts too large for int64 once scaled are rejected rather than left to wrap around
+    major_digits = parts["major"].str.lstrip("0")
+    fits = (major_digits.str.len() < len(MAX_MAJOR_DIGITS)) | (
+        (major_digits.str.len() == len(MAX_MAJOR_DIGITS)) & (major_digits <= MAX_MAJOR_DIGITS)
+    )
+    valid &= fits.fillna(False).astype(bool)
+    parts = parts.where(valid, "0")
+    major = parts["major"].astype("int64")
+    minor = parts["minor"].fillna("").str.slice(0, PARSE_SCALE).str.ljust(PARSE_SCALE, "0").astype("int64")
+    fine = major * 10 ** PARSE_SCALE + minor
+    divisor = 10 ** (PARSE_SCALE - exponent)
+    amount = fine // divisor + (fine % divisor * 2 >= divisor).astype("int64")
+    amount = amount.where(parts["sign"] != "-", -amount).astype("Int64")
+    return amount.where(valid, pd.NA)
+
+# Function to convert int64 minor units back to major units (for charts and inputs)
+def from_minor_units(values, currency=CURRENCY):
+    if pd.api.types.is_scalar(values):
+        return values / 10 ** currency_exponent(currency)
+    if not isinstance(values, (pd.Series, pd.DataFrame)):
+        values = pd.Series(values)
+    return values.astype("float64") / 10 ** currency_exponent(currency)
+
+# Function to format a column of minor units as plain decimal text (used for storage)
+def format_minor_units(values, currency=CURRENCY):
+    amount = pd.to_numeric(pd.Series(values), errors="coerce")
+    missing = amount.isna()
+    amount = amount.fillna(0).round().astype("int64")
+    scale = 10 ** currency_exponent(currency)
+    sign = amount.lt(0).map({True: "-", False: ""})
+    major, minor = amount.abs().divmod(scale)
+    # Adding the scale before slicing off the leading "1" zero-pads the fraction
+    fraction = (minor + scale).astype(str).str.slice(1)
+    text = sign + major.astype(str) + fraction.where(fraction == "", "." + fraction)
+    # Invalid amounts are written back empty rather than as 0
+    return text.where(~missing, "")
+
+# Function to format a single minor-unit amount for display, e.g. "Rp 1,650,000"
+def format_money(amount, currency=CURRENCY):
+    exponent = currency_exponent(currency)
+    symbol = currency_symbol(currency)
+    sign = "-" if amount < 0 else ""
+    major, minor = divmod(abs(int(amount)), 10 ** exponent)
+    text = f"{major:,}" + (f".{minor:0{exponent}d}" if exponent else "")
+    return f"{sign}{symbol} {text}"
+
+# Function to get the display symbol for a currency, e.g. "Rp"
+def currency_symbol(currency=CURRENCY):
+    return CURRENCY_SYMBOLS.get(currency, currency)
+
+# Function to let the user pick the reporting currency (kept in session state across pages)
+def select_base_currency():
+    currencies = list(CURRENCY_EXPONENTS)
+    current = st.session_state.get("base_currency", CURRENCY)
+    base_currency = st.sidebar.selectbox("Base Currency", currencies, index=currencies.index(current))
+    st.session_state.base_currency = base_currency
+    return base_currency
+
 # Function to save DataFrame to CSV
 def save_to_csv(df):
     try:
@@ -24,8 +141,10 @@ def save_to_csv(df):
             df = pd.DataFrame(columns=expected_cols)
         for col in expected_cols:
             if col not in df.columns:
-                df[col] = ""
+                df[col] = optional_cols.get(col, "")
         df["Date"] = pd.to_datetime(df["Date"])
+        df["Currency"] = normalize_currency(df["Currency"])
+        df["Amount"] = format_minor_units(df["Amount"], df["Currency"])
         df = df.sort_values("Date", ascending=False)
         df.to_csv(transactions_data, index=False, date_format="%Y-%m-%d")
         print(f"Data saved to {transactions_data}")
@@ -35,33 +154,275 @@ def save_to_csv(df):
         st.error(f"Error saving data: {str(e)}")
         return False
 
-# Function to load DataFrame from CSV
-def load_csv():
+# Function to read transactions.csv into a DataFrame; raises on failure
+def read_transactions():
+    if not os.path.exists(transactions_data):
+        print("Creating new transaction file")
+        df = pd.DataFrame(columns=expected_cols)
+        df.to_csv(transactions_data, index=False)
+        return df.astype({"Amount": "Int64"})
+    print(f"Loading data from {transactions_data}")
+    df = pd.read_csv(transactions_data, dtype={"Amount": str})
+    for col in expected_cols:
+        if col not in df.columns:
+            df[col] = optional_cols.get(col, "")
+    df = df[expected_cols]
+    df["Currency"] = normalize_currency(df["Currency"])
+    df["Amount"] = to_minor_units(df["Amount"], df["Currency"])
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
+    # Rows with an invalid amount are kept as NA (not dropped) so the next save doesn't erase them
+    df = df.dropna(subset=["Date"])
+    df = df.sort_values("Date", ascending=False).reset_index(drop=True)
+    print(f"Loaded {len(df)} transactions")
+    return df
+
+# Function to get a file's version (changes whenever the file is rewritten)
+def get_file_version(path):
     try:
-        if os.path.exists(transactions_data):
-            print(f"Loading data from {transactions_data}")
-            df = pd.read_csv(transactions_data)
-            for col in expected_cols:
-                if col not in df.columns:
-                    df[col] = ""
-            df = df[expected_cols]
-            df["Date"] = pd.to_datetime(df["Date"], errors="coerce")
-            df = df.dropna(subset=["Date"])
-            df = df.sort_values("Date", ascending=False).reset_index(drop=True)
-            print(f"Loaded {len(df)} transactions")
-            return df
-        else:
-            print("Creating new transaction file")
-            df = pd.DataFrame(columns=expected_cols)
-            df.to_csv(transactions_data, index=False)
-            return df
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+# Function to get the current version of transactions.csv
+def get_data_version():
+    return get_file_version(transactions_data)
+
+# Function to estimate the memory held by a value (frames, containers, scalars)
+def estimate_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+# Read-only transaction frames shared by all sessions, one per data version, reference-counted
+class SharedDatasetStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._sizes = {}
+        self._refcounts = {}
+        self._derived = {}
+        self._latest = None
+
+    def acquire(self, version, loader):
+        with self._lock:
+            if version not in self._frames:
+                # The loader must raise on failure, so a failed read is retried instead of cached
+                frame = loader()
+                self._frames[version] = frame
+                self._sizes[version] = estimate_size(frame)
+                self._refcounts[version] = 0
+            self._refcounts[version] += 1
+            self._latest = version
+            self._evict_unused()
+            return self._frames[version]
+
+    def release(self, version):
+        with self._lock:
+            if version in self._refcounts:
+                self._refcounts[version] -= 1
+                self._evict_unused()
+
+    def get(self, version):
+        with self._lock:
+            return self._frames.get(version)
+
+    def get_derived(self, version, key, builder):
+        # Frames computed from one data version (e.g. currency conversions), dropped with it
+        with self._lock:
+            derived = self._derived.setdefault(version, {})
+            if key not in derived:
+                # Only the newest variant of each kind is kept, e.g. the latest rate table per base currency
+                for stale in [k for k in derived if k[:-1] == key[:-1]]:
+                    del derived[stale]
+                derived[key] = builder()
+            return derived[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "versions": len(self._frames),
+                "shared_bytes": sum(self._sizes.values()) + estimate_size(self._derived),
+                "sessions": sum(self._refcounts.values())
+            }
+
+    def _evict_unused(self):
+        # Keep the latest version warm for the next session; drop older ones nobody holds
+        for version in [v for v, count in self._refcounts.items() if count <= 0 and v != self._latest]:
+            del self._frames[version], self._sizes[version], self._refcounts[version]
+            self._derived.pop(version, None)
+
+# A session's hold on one data version; released on version change or when the session is discarded
+class DatasetLease:
+    def __init__(self, store, version):
+        self.version = version
+        self._release = weakref.finalize(self, store.release, version)
+
+    def release(self):
+        self._release()
+
+@st.cache_resource
+def get_dataset_store():
+    return SharedDatasetStore()
+
+# Function to get the shared transaction frame; raises if transactions.csv can't be read
+def get_shared_transactions():
+    store = get_dataset_store()
+    version = get_data_version()
+    lease = st.session_state.get("dataset_lease")
+    if lease is None or lease.version != version:
+        df = store.acquire(version, read_transactions)
+        st.session_state["dataset_lease"] = DatasetLease(store, version)
+        if lease is not None:
+            lease.release()
+    else:
+        df = store.get(version)
+        if df is None:
+            # The store was recreated (e.g. cache cleared) since this lease was taken
+            lease.release()
+            df = store.acquire(version, read_transactions)
+            st.session_state["dataset_lease"] = DatasetLease(store, version)
+    # Reported on every call (not in the cached load) so every session sees it
+    invalid = int(df["Amount"].isna().sum())
+    if invalid:
+        st.error(f"{invalid} transaction(s) have an invalid amount and are left out of totals. Please fix them in the Transaction History.")
+    # A shallow copy under copy-on-write: callers may add or assign columns without touching the shared frame
+    return df.copy(deep=False)
+
+# Function to get the shared transactions converted to a base currency, plus the count of rows without a rate
+def get_converted_transactions(base_currency=CURRENCY):
+    df = get_shared_transactions()
+    version = st.session_state["dataset_lease"].version
+    key = ("converted", base_currency, get_file_version(exchange_rates_data))
+    # Only the converted Amount column and the no-rate mask are cached; the frame is rebuilt on read
+    converted = get_dataset_store().get_derived(version, key, lambda: convert_transaction_amounts(df, base_currency))
+    if converted is None:
+        return df, 0
+    amounts, no_rate = converted
+    df = df.assign(Amount=amounts, Currency=base_currency)
+    if no_rate.any():
+        df = df[~no_rate]
+    return df, int(no_rate.sum())
+
+# Function to report resident memory for the current session vs. the shared dataset
+def get_memory_metrics():
+    stats = get_dataset_store().stats()
+    session_bytes = sum(estimate_size(v) for k, v in st.session_state.items() if k != "dataset_lease")
+    shared_per_session = stats["shared_bytes"] / max(stats["sessions"], 1)
+    return {
+        "session_state_bytes": session_bytes,
+        "shared_bytes": stats["shared_bytes"],
+        "shared_versions": stats["versions"],
+        "active_sessions": stats["sessions"],
+        "resident_bytes_per_session": session_bytes + shared_per_session
+    }
+
+# --- Exchange Rates ---
+# Rate = value of one major unit of Currency in CURRENCY, valid from Date onwards
+rate_cols = ["Date", "Currency", "Rate"]
+
+# Function to clean an exchange-rate table (parse dates, currencies and rates, drop bad rows)
+def clean_exchange_rates(rates):
+    rates = rates.copy()
+    rates["Date"] = pd.to_datetime(rates["Date"], errors="coerce")
+    rates["Currency"] = normalize_currency(rates["Currency"])
+    rates["Rate"] = pd.to_numeric(rates["Rate"], errors="coerce")
+    rates = rates.dropna(subset=["Date", "Rate"])
+    return rates[rates["Rate"] > 0][rate_cols].reset_index(drop=True)
+
+# Function to load the local exchange-rate table
+def load_exchange_rates():
+    try:
+        if not os.path.exists(exchange_rates_data) or os.path.getsize(exchange_rates_data) == 0:
+            return clean_exchange_rates(pd.DataFrame(columns=rate_cols))
+        return clean_exchange_rates(pd.read_csv(exchange_rates_data))
     except Exception as e:
-        print(f"Error loading data: {str(e)}")
-        st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame(columns=expected_cols)
+        print(f"Error loading exchange rates: {str(e)}")
+        st.error(f"Error loading exchange rates: {str(e)}")
+        return pd.DataFrame(columns=rate_cols)
+
+# Function to import exchange rates (e.g. an offline CSV export) into the local table
+def import_exchange_rates(rates_df):
+    try:
+        rates_df.columns = [col.strip() for col in rates_df.columns]
+        missing_cols = [col for col in rate_cols if col not in rates_df.columns]
+        if missing_cols:
+            st.error(f"The following columns are missing in the exchange rate file: {missing_cols}")
+            return False
+        existing = load_exchange_rates().sort_values(["Currency", "Date"]).reset_index(drop=True)
+        combined = pd.concat([existing, clean_exchange_rates(rates_df)], ignore_index=True)
+        combined = combined.drop_duplicates(subset=["Date", "Currency"], keep="last")
+        combined = combined.sort_values(["Currency", "Date"]).reset_index(drop=True)
+        if combined.equals(existing):
+            # Nothing new; keep the file (and its version) so cached conversions stay valid
+            return True
+        os.makedirs(DATA_DIR, exist_ok=True)
+        combined.to_csv(exchange_rates_data, index=False, date_format="%Y-%m-%d")
+        print(f"Exchange rates saved to {exchange_rates_data}")
+        return True
+    except Exception as e:
+        print(f"Error importing exchange rates: {str(e)}")
+        st.error(f"Error importing exchange rates: {str(e)}")
+        return False
+
+# Function to look up the rate for each (date, currency) as of that date
+def lookup_rates(dates, currencies, rates):
+    dates = pd.Series(pd.to_datetime(dates, errors="coerce"), index=currencies.index)
+    # Rows without a date can't be joined as of a date; they get no rate (NaN)
+    dated = dates.notna().values
+    lookup = pd.DataFrame({
+        "Date": dates.astype("datetime64[ns]").values,
+        "Currency": currencies.astype(str).values,
+        "Row": range(len(currencies))
+    })[dated].sort_values("Date")
+    table = rates.assign(
+        Date=rates["Date"].astype("datetime64[ns]"),
+        Currency=rates["Currency"].astype(str),
+        Rate=rates["Rate"].astype("float64")
+    ).sort_values("Date")
+    rate = pd.Series(float("nan"), index=range(len(currencies)))
+    if not table.empty and not lookup.empty:
+        backward = pd.merge_asof(lookup, table, on="Date", by="Currency", direction="backward")
+        # Dates before the first known rate fall back to the earliest one
+        forward = pd.merge_asof(lookup, table, on="Date", by="Currency", direction="forward")
+        rate[lookup["Row"].values] = backward["Rate"].fillna(forward["Rate"]).values
+    rate = pd.Series(rate.values, index=currencies.index)
+    return rate.where(currencies != CURRENCY, 1.0)
+
+# Function to convert minor-unit amounts into base-currency minor units (NA where no rate is known)
+def convert_amounts(amounts, currencies, dates, base_currency=CURRENCY, rates=None):
+    same = currencies == base_currency
+    if same.all():
+        return amounts.astype("Int64")
+    if rates is None:
+        rates = load_exchange_rates()
+    major = from_minor_units(amounts, currencies)
+    rate_from = lookup_rates(dates, currencies, rates)
+    rate_to = lookup_rates(dates, pd.Series(base_currency, index=currencies.index), rates)
+    base_major = major * rate_from / rate_to
+    converted = (base_major * 10 ** currency_exponent(base_currency)).round().astype("Int64")
+    # Amounts already in the base currency are passed through exactly
+    converted[same] = amounts[same]
+    return converted
+
+# Function to convert a transaction frame's amounts to one base currency
+# Returns (converted amounts, rows without a rate), or None when every row is already in the base currency
+def convert_transaction_amounts(df, base_currency=CURRENCY):
+    if df.empty or (df["Currency"] == base_currency).all():
+        return None
+    converted = convert_amounts(df["Amount"], df["Currency"], df["Date"], base_currency)
+    # Invalid amounts stay NA but aren't counted as missing a rate
+    no_rate = converted.isna() & df["Amount"].notna()
+    return converted, no_rate
 
 # Function to save budget dictionary to CSV
-def save_budget_csv(budget_dict):
+def save_budget_csv(budget_dict, currency=CURRENCY):
     budget_file = os.path.join(DATA_DIR, "budget.csv")
     try:
         os.makedirs(DATA_DIR, exist_ok=True)
@@ -75,6 +436,8 @@ def save_budget_csv(budget_dict):
                 "Others": 0
             }
         df = pd.DataFrame(list(budget_dict.items()), columns=["Category", "Budget"])
+        df["Budget"] = format_minor_units(df["Budget"], currency)
+        df["Currency"] = currency
         df.to_csv(budget_file, index=False)
         print(f"Budget saved to {budget_file}")
         return True
@@ -86,10 +449,9 @@ def save_budget_csv(budget_dict):
 # Function to get historical average spending by category
 def get_historical_average_by_category(df, categories, months_back=3):
     if df.empty or "Date" not in df.columns:
-        return {cat: 0.0 for cat in categories}
-    df["Date"] = pd.to_datetime(df["Date"], errors='coerce')
-    df = df.dropna(subset=["Date"])
-    df["Month"] = df["Date"].dt.to_period("M")
+        return {cat: 0 for cat in categories}
+    df = df.assign(Date=pd.to_datetime(df["Date"], errors='coerce')).dropna(subset=["Date"])
+    df = df.assign(Month=df["Date"].dt.to_period("M"))
     recent_months = sorted(df["Month"].unique())[-months_back:]
     filtered_df = df[df["Month"].isin(recent_months) & df["Category"].isin(categories)]
     averages = (
@@ -97,16 +459,19 @@ def get_historical_average_by_category(df, categories, months_back=3):
         .mean()
         .to_dict()
     )
-    return {cat: round(averages.get(cat, 0.0), 2) for cat in categories}
+    return {cat: int(round(averages.get(cat, 0))) for cat in categories}
 
 # Function to fetch transaction data for filtering (with date range)
 def fetch_data_with_range(start_date=None, end_date=None):
     if not os.path.exists(transactions_data):
         return pd.DataFrame()
-    df = pd.read_csv(transactions_data)
+    df = pd.read_csv(transactions_data, dtype={"Amount": str})
+    df["Currency"] = normalize_currency(df["Currency"]) if "Currency" in df.columns else CURRENCY
+    df["Amount"] = to_minor_units(df["Amount"], df["Currency"])
     df = df.rename(columns={
         "Date": "date",
         "Amount": "amount",
+        "Currency": "currency",
         "Category": "category",
         "Subcategory": "subcategory",
         "Payment Method": "payment_method",
@@ -121,31 +486,30 @@ def fetch_data_with_range(start_date=None, end_date=None):
     return df
 
 # Function to fetch and prepare data for analysis (always returns English columns)
-def fetch_data():
+def fetch_data(base_currency=None):
+    empty_cols = ["date", "description", "amount", "category", "subcategory", "payment_method", "note", "currency"]
     try:
-        if not os.path.exists(transactions_data) or os.path.getsize(transactions_data) == 0:
-            return pd.DataFrame(columns=["date", "description", "amount", "category", "subcategory", "payment_method", "note"])
-        df = pd.read_csv(transactions_data)
-        if df.empty or len(df.columns) == 0:
-            return pd.DataFrame(columns=["date", "description", "amount", "category", "subcategory", "payment_method", "note"])
-        df = df.rename(columns={
+        if base_currency is None:
+            df = get_shared_transactions()
+        else:
+            df, skipped = get_converted_transactions(base_currency)
+            if skipped:
+                st.warning(f"{skipped} transaction(s) skipped: no exchange rate to {base_currency}. Import rates on the Input Transactions page.")
+        if df.empty:
+            return pd.DataFrame(columns=empty_cols)
+        return df.rename(columns={
             "Date": "date",
             "Description": "description",
             "Amount": "amount",
             "Category": "category",
             "Subcategory": "subcategory",
             "Payment Method": "payment_method",
-            "Note": "note"
+            "Note": "note",
+            "Currency": "currency"
         })
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.dropna(subset=["date"])
-        df = df.sort_values("date", ascending=False)
-        return df
-    except pd.errors.EmptyDataError:
-        return pd.DataFrame(columns=["date", "description", "amount", "category", "subcategory", "payment_method", "note"])
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame(columns=["date", "description", "amount", "category", "subcategory", "payment_method", "note"])
+        return pd.DataFrame(columns=empty_cols)
 
 # --- Financial Summary ---
 def get_financial_summary(df):
@@ -155,8 +519,8 @@ def get_financial_summary(df):
             "total_expense": 0,
             "balance": 0
         }
-    total_income = df[df["category"] == "Income"]["amount"].sum()
-    total_expense = df[df["category"] == "Expense"]["amount"].sum()
+    total_income = int(df[df["category"] == "Income"]["amount"].sum())
+    total_expense = int(df[df["category"] == "Expense"]["amount"].sum())
     balance = total_income - total_expense
     return {
         "total_income": total_income,
@@ -165,7 +529,7 @@ def get_financial_summary(df):
     }
 
 # Function to load budget from CSV
-def load_budget_csv():
+def load_budget_csv(base_currency=None):
     budget_file = os.path.join(DATA_DIR, "budget.csv")
     default_budget = {
         "Food": 0,
@@ -177,15 +541,150 @@ def load_budget_csv():
     }
     try:
         if os.path.exists(budget_file) and os.path.getsize(budget_file) > 0:
-            df = pd.read_csv(budget_file)
-            if len(df.columns) == 0:
+            df = pd.read_csv(budget_file, dtype={"Budget": str})
+            if len(df.columns) == 0 or "Budget" not in df.columns:
                 save_budget_csv(default_budget)
                 return default_budget
-            return dict(zip(df["Category"], df["Budget"]))
+            currency = normalize_currency(df["Currency"]) if "Currency" in df.columns else pd.Series(CURRENCY, index=df.index)
+            budget = to_minor_units(df["Budget"], currency)
+            if budget.isna().any():
+                invalid = df.loc[budget.isna(), "Category"].tolist()
+                print(f"Invalid budget amounts for: {invalid}")
+                st.error(f"Invalid budget amounts for: {invalid}")
+            if base_currency is not None and (currency != base_currency).any():
+                # Converted for display and comparison only; budget.csv stays in its stored currency
+                today = pd.Series(pd.Timestamp.today().normalize(), index=df.index)
+                converted = convert_amounts(budget, currency, today, base_currency)
+                if (converted.isna() & budget.notna()).any():
+                    st.warning(f"No exchange rate to convert the budget to {base_currency}; those categories are unavailable.")
+                budget = converted
+            # Categories without a valid amount map to None (unknown), never to 0
+            return {cat: None if pd.isna(amount) else int(amount) for cat, amount in zip(df["Category"], budget)}
         else:
             save_budget_csv(default_budget)
             return default_budget
     except Exception as e:
         print(f"Error loading budget: {str(e)}")
         st.error(f"Error loading budget: {str(e)}")
-        return default_budget
\ No newline at end of file
+        return {cat: None for cat in default_budget}
+
+# Function to get the currency budget.csv is stored in
+def load_budget_currency():
+    budget_file = os.path.join(DATA_DIR, "budget.csv")
+    try:
+        df = pd.read_csv(budget_file, dtype=str)
+        if "Currency" in df.columns and not df.empty:
+            return normalize_currency(df["Currency"]).iloc[0]
+    except Exception:
+        pass
+    return CURRENCY
+
+# Function to convert a budget dictionary between currencies at today's rate; None where no rate is known
+def convert_budget(budget_dict, from_currency, to_currency):
+    if from_currency == to_currency or not budget_dict:
+        return dict(budget_dict)
+    amounts = pd.Series(list(budget_dict.values()), index=list(budget_dict), dtype="Int64")
+    today = pd.Series(pd.Timestamp.today().normalize(), index=amounts.index)
+    converted = convert_amounts(amounts, pd.Series(from_currency, index=amounts.index), today, to_currency)
+    return {cat: None if pd.isna(amount) else int(amount) for cat, amount in converted.items()}
+
+# --- Budget Tracking ---
+# Alert when a subcategory reaches these shares of its monthly budget
+BUDGET_ALERT_THRESHOLDS = [0.8, 1.0]
+
+# Function to total expenses per (month, subcategory, currency) in minor units, without converting
+def expense_totals(df):
+    if df is None or df.empty:
+        return {}
+    expenses = df[df["Category"] == "Expense"]
+    if expenses.empty:
+        return {}
+    dates = pd.to_datetime(expenses["Date"], errors="coerce")
+    currency = normalize_currency(expenses["Currency"]) if "Currency" in expenses.columns else pd.Series(CURRENCY, index=expenses.index)
+    totals = (
+        pd.DataFrame({
+            "month": dates.dt.strftime("%Y-%m"),
+            "subcategory": expenses["Subcategory"],
+            "currency": currency,
+            "amount": pd.Series(expenses["Amount"]).astype("Int64")
+        })
+        .dropna()
+        .groupby(["month", "subcategory", "currency"])["amount"]
+        .sum()
+    )
+    return {key: int(amount) for key, amount in totals.items()}
+
+# Function to build the batched counter changes for rows added to (and removed from) the file
+def expense_deltas(added, removed=None):
+    deltas = expense_totals(added)
+    for key, amount in expense_totals(removed).items():
+        deltas[key] = deltas.get(key, 0) - amount
+    # Counters that net to no change (e.g. unedited rows in the editor) don't count as touched
+    return {key: amount for key, amount in deltas.items() if amount != 0}
+
+# Spent-to-date counters per (month, subcategory), one per currency, updated in place on every transaction write
+# Amounts stay in their own currency, so importing a rate later never leaves the counters stale
+class BudgetTracker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spent = {}
+        self._version = None
+
+    def apply(self, deltas, previous_version, new_version, loader):
+        with self._lock:
+            if self._version != previous_version:
+                # The file changed elsewhere (or first use); recount from the saved data, which already holds the deltas
+                self._spent = {}
+                for (month, subcategory, currency), amount in expense_totals(loader()).items():
+                    self._spent.setdefault((month, subcategory), {})[currency] = amount
+            else:
+                for (month, subcategory, currency), amount in deltas.items():
+                    by_currency = self._spent.setdefault((month, subcategory), {})
+                    by_currency[currency] = by_currency.get(currency, 0) + amount
+            self._version = new_version
+            touched = {(month, subcategory) for month, subcategory, _ in deltas}
+            return {key: dict(self._spent.get(key, {})) for key in touched}
+
+@st.cache_resource
+def get_budget_tracker():
+    return BudgetTracker()
+
+# Function to compare spent-to-date counters against the budget (in CURRENCY) and return threshold alerts
+def check_budget_alerts(spent, budget):
+    parts = pd.DataFrame(
+        [(month, subcategory, currency, amount)
+         for (month, subcategory), by_currency in spent.items()
+         for currency, amount in by_currency.items()],
+        columns=["month", "subcategory", "currency", "amount"]
+    )
+    if parts.empty:
+        return []
+    # Converted now, at the rate as of each month's end; amounts without a rate yet are left out
+    month_end = pd.PeriodIndex(parts["month"], freq="M").end_time.normalize()
+    parts["amount"] = convert_amounts(
+        parts["amount"].astype("Int64"), parts["currency"], pd.Series(month_end, index=parts.index), CURRENCY
+    )
+    totals = parts.groupby(["month", "subcategory"])["amount"].sum()
+    alerts = []
+    for (month, subcategory), amount in totals.items():
+        limit = budget.get(subcategory, 0)
+        if limit is None or limit <= 0:
+            continue
+        amount = int(amount)
+        ratio = amount / limit
+        reached = [t for t in BUDGET_ALERT_THRESHOLDS if ratio >= t]
+        if reached:
+            alerts.append({
+                "month": month,
+                "subcategory": subcategory,
+                "spent": amount,
+                "budget": limit,
+                "ratio": ratio,
+                "threshold": reached[-1]
+            })
+    return alerts
+
+# Function to apply expense deltas after a successful save and return any budget alerts
+def record_expense_deltas(deltas, previous_version):
+    spent = get_budget_tracker().apply(deltas, previous_version, get_data_version(), get_shared_transactions)
+    return check_budget_alerts(spent, load_budget_csv(CURRENCY))
@@ -3,7 +3,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-from app_utils import load_csv, save_to_csv
+from app_utils import get_shared_transactions, save_to_csv, to_minor_units, from_minor_units, normalize_currency, import_exchange_rates, get_data_version, expense_deltas, record_expense_deltas, format_money, CURRENCY, CURRENCY_EXPONENTS, expected_cols, optional_cols, rate_cols
 import pandas as pd
 
 st.header("💸 Transaction Input")
@@ -12,6 +12,19 @@ tabs = st.tabs([' ➕ New Transaction', ' 📄 Transaction History'])
 CATEGORIES = ["Income", "Expense"]
 SUBCATEGORIES = ["Salary", "Bonus", "Food", "Transport", "Shopping", "Entertainment", "Savings", "Others"]
 PAYMENT = ["Cash", "Debit", "Credit", "E-Wallet"]
+CURRENCIES = list(CURRENCY_EXPONENTS)
+
+# Show budget alerts for the subcategories touched by the last write
+def show_budget_alerts(alerts):
+    for alert in alerts:
+        message = (
+            f"{alert['subcategory']} ({alert['month']}): {format_money(alert['spent'])} spent "
+            f"of {format_money(alert['budget'])} budget ({alert['ratio']:.0%})"
+        )
+        if alert["ratio"] >= 1:
+            st.error(f"🚨 Over budget! {message}")
+        else:
+            st.warning(f"⚠️ Approaching budget limit: {message}")
 
 with tabs[0]:
     st.subheader("Manual Transaction Input")
@@ -20,6 +33,7 @@ with tabs[0]:
         with col1:
             date = st.date_input("Date")
             amount = st.number_input("Amount", min_value=0.0, step=1000.0)
+            currency = st.selectbox("Currency", CURRENCIES, index=CURRENCIES.index(CURRENCY))
             category = st.selectbox("Category", CATEGORIES)
         with col2:
             description = st.text_input("Description")
@@ -31,28 +45,35 @@ with tabs[0]:
         if submit_button:
             if not description:
                 st.error("Please enter a transaction description!")
+            elif to_minor_units(amount, currency) is None:
+                st.error("The amount is too large to store. Please check it and try again.")
             else:
                 try:
                     new_row = {
                         "Date": pd.to_datetime(date).strftime("%Y-%m-%d"),
                         "Description": description,
-                        "Amount": float(amount),
+                        "Amount": to_minor_units(amount, currency),
                         "Category": category,
                         "Subcategory": subcategory,
                         "Payment Method": payment_method,
-                        "Note": note if note else ""
+                        "Note": note if note else "",
+                        "Currency": currency
                     }
                     
                     # Load existing data
-                    df = load_csv()
+                    previous_version = get_data_version()
+                    df = get_shared_transactions()
                     
                     # Add new row
-                    new_df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+                    new_row_df = pd.DataFrame([new_row])
+                    deltas = expense_deltas(new_row_df)
+                    new_df = pd.concat([df, new_row_df], ignore_index=True)
                     
                     # Save and refresh
                     if save_to_csv(new_df):
                         st.session_state.need_refresh = True
                         st.success("✅ Transaction saved successfully!")
+                        show_budget_alerts(record_expense_deltas(deltas, previous_version))
                     else:
                         st.error("Failed to save transaction. Please try again.")
                 except Exception as e:
@@ -63,14 +84,12 @@ with tabs[0]:
         """
         <b>Make sure your CSV file has the following columns:</b>
         <ul>
-            Date, Description, Amount, Category, Subcategory, Payment Method, Note
+            Date, Description, Amount, Category, Subcategory, Payment Method, Note, Currency (optional, defaults to IDR)
         </ul>
         """,
         unsafe_allow_html=True
     )
-    template_df = pd.DataFrame(columns=[
-        "Date", "Description", "Amount", "Category", "Subcategory", "Payment Method", "Note"
-    ])
+    template_df = pd.DataFrame(columns=expected_cols)
     csv = template_df.to_csv(index=False)
 
     st.download_button(
@@ -82,38 +101,74 @@ with tabs[0]:
 
     uploaded_file = st.file_uploader("Choose a CSV file", type=["csv"])
     if uploaded_file is not None:
-        uploaded_df = pd.read_csv(uploaded_file)
-        expected_cols = [
-            "Date", "Description", "Amount", "Category",
-            "Subcategory", "Payment Method", "Note"
-        ]
+        uploaded_df = pd.read_csv(uploaded_file, dtype=str)
         uploaded_df.columns = [col.strip() for col in uploaded_df.columns]
-        missing_cols = [col for col in expected_cols if col not in uploaded_df.columns]
+        missing_cols = [col for col in expected_cols if col not in uploaded_df.columns and col not in optional_cols]
         if missing_cols:
             st.error(f"The following columns are missing in the CSV file: {missing_cols}")
         else:
+            for col, default in optional_cols.items():
+                if col not in uploaded_df.columns:
+                    uploaded_df[col] = default
             uploaded_df = uploaded_df[expected_cols]
-            uploaded_df["Date"] = pd.to_datetime(uploaded_df["Date"], errors="coerce")
-            uploaded_df = uploaded_df.dropna(subset=["Date"])
-            existing_df = load_csv()
-            combined_df = pd.concat([existing_df, uploaded_df], ignore_index=True)
-            combined_df = combined_df.drop_duplicates()
-            save_to_csv(combined_df)
-            st.success("✅ Data from CSV uploaded and saved successfully!")
+            uploaded_df["Currency"] = normalize_currency(uploaded_df["Currency"])
+            uploaded_df["Amount"] = to_minor_units(uploaded_df["Amount"], uploaded_df["Currency"])
+            # Line numbers in the file: +2 for the header row and 1-based counting
+            invalid_rows = (uploaded_df.index[uploaded_df["Amount"].isna()] + 2).tolist()
+            if invalid_rows:
+                st.error(f"Invalid amounts on CSV lines {invalid_rows}. Nothing was imported; please fix these amounts and upload again.")
+            else:
+                uploaded_df["Date"] = pd.to_datetime(uploaded_df["Date"], errors="coerce")
+                uploaded_df = uploaded_df.dropna(subset=["Date"])
+                previous_version = get_data_version()
+                try:
+                    existing_df = get_shared_transactions()
+                except Exception as e:
+                    st.error(f"Error loading data: {str(e)}")
+                    st.stop()
+                combined_df = pd.concat([existing_df, uploaded_df], ignore_index=True)
+                # Batched counter deltas: uploaded rows that survive de-duplication, minus existing duplicates dropped
+                kept = ~combined_df.duplicated()
+                n_existing = len(existing_df)
+                deltas = expense_deltas(
+                    combined_df[n_existing:][kept[n_existing:]],
+                    existing_df[~kept[:n_existing].values]
+                )
+                combined_df = combined_df.drop_duplicates()
+                if save_to_csv(combined_df):
+                    st.success("✅ Data from CSV uploaded and saved successfully!")
+                    show_budget_alerts(record_expense_deltas(deltas, previous_version))
+
+    st.subheader("Upload Exchange Rates")
+    st.markdown(
+        f"""
+        <b>Rates are stored locally and used to convert other currencies to your base currency.</b>
+        <ul>
+            Columns: {", ".join(rate_cols)} (Rate = value of 1 unit of Currency in {CURRENCY}, valid from Date onwards)
+        </ul>
+        """,
+        unsafe_allow_html=True
+    )
+    rates_file = st.file_uploader("Choose an exchange rate CSV file", type=["csv"])
+    if rates_file is not None:
+        if import_exchange_rates(pd.read_csv(rates_file, dtype=str)):
+            st.success("✅ Exchange rates imported successfully!")
 
 with tabs[1]:
     st.write("Transaction List:")
+    # Alerts from the last "Save Changes" survive the rerun that follows it
+    show_budget_alerts(st.session_state.pop("budget_alerts", []))
     
-    # Load and prepare data
-    df = load_csv()
+    # Shared data (already parsed and sorted by date); filters only build masks
+    try:
+        df = get_shared_transactions()
+    except Exception as e:
+        st.error(f"Error loading data: {str(e)}")
+        st.stop()
     
     if df.empty:
         st.info("No transactions found.")
     else:
-        # Convert and clean date data
-        df["Date"] = pd.to_datetime(df["Date"])
-        df = df.sort_values("Date", ascending=False).reset_index(drop=True)
-        
         # Set min and max dates
         min_date = df["Date"].min().date()
         max_date = df["Date"].max().date()
@@ -140,40 +195,32 @@ with tabs[1]:
         with col4:
             search = st.text_input("Search Description")
 
-        # Apply filters
-        filtered_df = df.copy()
-
         # Apply date filter
-        filtered_df = filtered_df[
-            (filtered_df["Date"].dt.date >= start_date) &
-            (filtered_df["Date"].dt.date <= end_date)
-        ]
+        mask = (df["Date"].dt.date >= start_date) & (df["Date"].dt.date <= end_date)
         
         # Apply category filters
         if category_filter != "All":
-            filtered_df = filtered_df[filtered_df["Category"] == category_filter]
+            mask &= df["Category"] == category_filter
         if subcategory_filter != "All":
-            filtered_df = filtered_df[filtered_df["Subcategory"] == subcategory_filter]
+            mask &= df["Subcategory"] == subcategory_filter
         if method_filter != "All":
-            filtered_df = filtered_df[filtered_df["Payment Method"] == method_filter]
+            mask &= df["Payment Method"] == method_filter
         
         # Apply search filter
         if search:
-            filtered_df = filtered_df[filtered_df["Description"].str.contains(search, case=False, na=False)]
+            mask &= df["Description"].str.contains(search, case=False, na=False)
+        filtered_df = df[mask]
         
         # Show data in editor
         if len(filtered_df) == 0:
             st.info("No transactions found in the selected date range.")
         else:
-            # Show data editor with current filters applied
+            # Show data editor with current filters applied (amounts in major units)
             edited_df = st.data_editor(
-                filtered_df,
+                filtered_df.assign(Amount=from_minor_units(filtered_df["Amount"], filtered_df["Currency"])),
                 num_rows="dynamic",
                 use_container_width=True,
-                column_order=[
-                    "Date", "Description", "Amount", "Category",
-                    "Subcategory", "Payment Method", "Note"
-                ]
+                column_order=expected_cols
             )
             
             # Action buttons
@@ -181,8 +228,18 @@ with tabs[1]:
             with col1:
                 if st.button("💾 Save Changes"):
                     try:
-                        save_to_csv(edited_df)
-                        st.success("✅ Changes saved successfully!")
-                        st.rerun()
+                        edited_df["Currency"] = normalize_currency(edited_df["Currency"])
+                        edited_df["Amount"] = to_minor_units(edited_df["Amount"], edited_df["Currency"])
+                        if edited_df["Amount"].isna().any():
+                            st.error("Some rows have a missing or invalid amount. Please fix them before saving.")
+                        else:
+                            previous_version = get_data_version()
+                            # Counter deltas: the edited rows replace the rows shown in the editor
+                            deltas = expense_deltas(edited_df, filtered_df)
+                            # Rows hidden by the filters are kept as they are
+                            if save_to_csv(pd.concat([df[~mask], edited_df], ignore_index=True)):
+                                st.session_state.budget_alerts = record_expense_deltas(deltas, previous_version)
+                                st.success("✅ Changes saved successfully!")
+                                st.rerun()
                     except Exception as e:
                         st.error(f"Failed to save changes: {str(e)}")
\ No newline at end of file
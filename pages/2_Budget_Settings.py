@@ -3,10 +3,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-import pandas as pd
 import requests
 import re
-from app_utils import load_csv, save_budget_csv, get_historical_average_by_category
+from app_utils import get_converted_transactions, load_budget_csv, load_budget_currency, convert_budget, save_budget_csv, get_historical_average_by_category, to_minor_units, from_minor_units, format_money, currency_symbol, select_base_currency
 
 # Load OpenRouter API key from Streamlit secrets
 api_key = st.secrets["openrouter"]["api_key"]
@@ -15,12 +14,25 @@ st.header("🧮 Budget Settings")
 
 SUBCATEGORIES = ["Food", "Transport", "Shopping", "Entertainment", "Savings", "Others"]
 
-# Load and preprocess transaction data safely
-transactions_df = load_csv()
-transactions_df = transactions_df.copy()  # avoid chained assignment warning
+base_currency = select_base_currency()
 
-# Ensure date column is datetime
-transactions_df.loc[:, "Date"] = pd.to_datetime(transactions_df["Date"], errors="coerce")
+# Shared transaction data in the base currency (a copy-on-write view)
+try:
+    transactions_df, skipped = get_converted_transactions(base_currency)
+except Exception as e:
+    st.error(f"Error loading data: {str(e)}")
+    st.stop()
+if skipped:
+    st.warning(f"{skipped} transaction(s) skipped: no exchange rate to {base_currency}.")
+# budget.csv keeps its stored currency; the page shows and edits it in the base currency
+stored_currency = load_budget_currency()
+stored_budget = load_budget_csv()
+saved_budget = load_budget_csv(base_currency)
+
+# Budget edits are kept in the currency they were made in; drop them if the base currency changes
+if st.session_state.get("budget_currency") != base_currency:
+    st.session_state.pop("budget_deltas", None)
+    st.session_state.budget_currency = base_currency
 
 # Calculate historical averages
 historical_averages = get_historical_average_by_category(transactions_df, SUBCATEGORIES, months_back=100)
@@ -33,17 +45,17 @@ if not transactions_df.empty:
             income_df.groupby(income_df["Date"].dt.to_period("M"))["Amount"]
             .sum()
         )
-        monthly_income = income_per_month.mean()
+        monthly_income = int(round(income_per_month.mean()))
 
-savings_goal = st.number_input("Target Total Savings (Rp)", min_value=0, step=50000)
+savings_goal = st.number_input(f"Target Total Savings ({currency_symbol(base_currency)})", min_value=0, step=50000)
 free_text_goal = st.text_area("Additional Notes (e.g. 'reduce food expenses', 'save for vacation')")
 
 if st.button("Generate AI Budget"):
     with st.spinner("Generating your budget... hang tight!"):
-        history_str = "\n".join([f"- {cat}: Rp{amount:,.0f}" for cat, amount in historical_averages.items()])
+        history_str = "\n".join([f"- {cat}: {format_money(amount, base_currency)}" for cat, amount in historical_averages.items()])
         prompt = (
             f"You are a financial assistant. Here are the average monthly expenses based on all historical data:\n{history_str}\n\n"
-            f"Estimated income for this month: Rp{monthly_income:,.0f}. Savings target: Rp{savings_goal:,.0f}.\n"
+            f"Estimated income for this month: {format_money(monthly_income, base_currency)}. Savings target: {format_money(to_minor_units(savings_goal, base_currency), base_currency)}.\n"
             f"{free_text_goal}\n"
             "Create a reasonable monthly budget. Only use these categories: Food, Transport, Shopping, Entertainment, Savings, Others."
             "Reply in markdown table format and use English."
@@ -72,7 +84,7 @@ if st.button("Generate AI Budget"):
                 cols = [c.strip(" *") for c in line.strip().split("|")[1:-1]]
                 if len(cols) >= 2:
                     category = cols[0].lower()
-                    amount_str = next((c for c in cols[1:] if re.search(r"\d", c)), None)
+                    amount_str = next((c for c in cols[1:] if re.search(r"\d", c) and "%" not in c), None)
                     percent_str = next((c for c in cols[1:] if "%" in c), None)
                     matched = None
                     for allowed in SUBCATEGORIES:
@@ -82,7 +94,9 @@ if st.button("Generate AI Budget"):
                     if not matched or not amount_str:
                         continue
                     try:
-                        amount = float(amount_str.replace("$", "").replace(",", "").replace("%", "").strip())
+                        amount = to_minor_units(amount_str, base_currency)
+                        if amount is None:
+                            continue
                         parsed_budget[matched] = amount
                         if percent_str:
                             try:
@@ -95,22 +109,50 @@ if st.button("Generate AI Budget"):
                         continue
 
         if parsed_budget:
-            st.session_state.budget_inputs = {cat: parsed_budget.get(cat, 0.0) for cat in SUBCATEGORIES}
-            st.session_state.budget_percentages = {cat: parsed_percentages.get(cat, None) for cat in SUBCATEGORIES}
+            # Session state only keeps the edits relative to the saved budget
+            st.session_state.budget_deltas = {
+                cat: parsed_budget.get(cat, 0) for cat in SUBCATEGORIES
+                if parsed_budget.get(cat, 0) != saved_budget.get(cat, 0)
+            }
+            st.session_state.budget_percentages = {
+                cat: percent for cat, percent in parsed_percentages.items() if percent is not None
+            }
             st.success("AI budget generated! Adjust as needed and save.")
         else:
             st.warning("⚠️ Oops! Could not parse AI budget. Please revise or try again.")
             
-if "budget_inputs" in st.session_state:
+if "budget_deltas" in st.session_state:
     st.markdown("✏️ You can adjust the values below before saving:")
+    budget_deltas = st.session_state.budget_deltas
+    # Saved values that could not be read or converted are unknown; they can't be edited or overwritten
+    unknown = [cat for cat in SUBCATEGORIES if saved_budget.get(cat, 0) is None]
     for category in SUBCATEGORIES:
         percent = st.session_state.get("budget_percentages", {}).get(category)
         label = f"{category}"
         if percent is not None:
             label += f" ({percent:.2f}%)"
-        st.session_state.budget_inputs[category] = st.number_input(
-            label, value=st.session_state.budget_inputs.get(category, 0.0), step=50000.0, key=f"budget_{category}"
-        )
-    if st.button("💾 Save Budget"):
-        save_budget_csv(st.session_state.budget_inputs)
-        st.success("✅ Budget saved successfully!")
+        if category in unknown:
+            budget_deltas.pop(category, None)
+            st.number_input(f"{label} (unavailable)", value=0.0, disabled=True, key=f"budget_{category}")
+            continue
+        current = budget_deltas.get(category, saved_budget.get(category, 0))
+        value = to_minor_units(st.number_input(
+            label, value=float(from_minor_units(current, base_currency)), step=50000.0, key=f"budget_{category}"
+        ), base_currency)
+        if value is None:
+            st.error(f"The {category} amount is too large to store.")
+            budget_deltas.pop(category, None)
+        elif value != saved_budget.get(category, 0):
+            budget_deltas[category] = value
+        else:
+            budget_deltas.pop(category, None)
+    if unknown:
+        st.warning(f"Saving is disabled: the saved budget for {', '.join(unknown)} could not be read or converted to {base_currency}.")
+    if st.button("💾 Save Budget", disabled=bool(unknown)):
+        # Only edited categories are converted back; the rest keep their stored amounts exactly
+        edits = convert_budget(budget_deltas, base_currency, stored_currency)
+        if any(amount is None for amount in edits.values()):
+            st.error(f"No exchange rate to convert the budget back to {stored_currency}. Budget not saved.")
+        elif save_budget_csv({cat: edits.get(cat, stored_budget.get(cat, 0)) for cat in SUBCATEGORIES}, stored_currency):
+            st.session_state.budget_deltas = {}
+            st.success("✅ Budget saved successfully!")
@@ -3,7 +3,7 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
-from app_utils import fetch_data, get_financial_summary, load_budget_csv
+from app_utils import fetch_data, get_financial_summary, load_budget_csv, from_minor_units, format_money, currency_symbol, select_base_currency
 import pandas as pd
 import calendar
 import numpy as np
@@ -12,7 +12,10 @@ import plotly.graph_objects as go
 
 st.header("📊 Financial Analysis")
 
-df = fetch_data()
+base_currency = select_base_currency()
+symbol = currency_symbol(base_currency)
+
+df = fetch_data(base_currency)
 if df.empty:
     st.warning("No transaction data available for analysis. Please input transactions first on the Input Transactions page.")
     st.stop()
@@ -27,7 +30,7 @@ months_mapping = {
 df["month_label"] = df["date"].dt.month.map(months_mapping) + " " + df["date"].dt.year.astype(str)
 df["year"] = df["date"].dt.year
 
-budget = load_budget_csv()
+budget = load_budget_csv(base_currency)
 allowed_categories = list(budget.keys()) if budget else ["Food", "Transport", "Shopping", "Entertainment", "Savings", "Others"]
 
 period_type = st.radio("Select Analysis Period", ["Monthly", "Yearly"], horizontal=True)
@@ -49,9 +52,9 @@ if period_type == "Monthly":
     month_df = df[df["month"] == selected_month]
     summary = get_financial_summary(month_df)
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Income", f"Rp {summary['total_income']:,.0f}")
-    col2.metric("Total Expense", f"Rp {summary['total_expense']:,.0f}")
-    col3.metric("Balance", f"Rp {summary['balance']:,.0f}")
+    col1.metric("Total Income", format_money(summary['total_income'], base_currency))
+    col2.metric("Total Expense", format_money(summary['total_expense'], base_currency))
+    col3.metric("Balance", format_money(summary['balance'], base_currency))
 
     # 1. Budget vs Actual Spending Bar Chart
     st.subheader("1️⃣ Budget vs Actual Spending")
@@ -64,8 +67,8 @@ if period_type == "Monthly":
     budget_series = pd.Series(budget)
     compare_df = pd.DataFrame({
         "Category": allowed_categories,
-        "Actual": actual.values,
-        "Budget": budget_series.reindex(allowed_categories, fill_value=0).values
+        "Actual": from_minor_units(actual, base_currency).values,
+        "Budget": from_minor_units(budget_series.reindex(allowed_categories, fill_value=0), base_currency).values
     })
     compare_df = compare_df.melt(id_vars="Category", value_vars=["Actual", "Budget"], var_name="Type", value_name="Amount")
     fig = px.bar(
@@ -82,7 +85,7 @@ if period_type == "Monthly":
         .sum()
         .reindex(allowed_categories, fill_value=0)
     )
-    spend_dist_nonzero = spend_dist[spend_dist > 0]
+    spend_dist_nonzero = from_minor_units(spend_dist[spend_dist > 0], base_currency)
     if spend_dist_nonzero.sum() > 0:
         fig2 = px.pie(
             names=spend_dist_nonzero.index,
@@ -102,6 +105,7 @@ if period_type == "Monthly":
         month_df[month_df["category"] == "Expense"]
         .groupby("day")["amount"]
         .sum()
+        .pipe(from_minor_units, base_currency)
     )
 
     year, month = month_df["date"].dt.year.iloc[0], month_df["date"].dt.month.iloc[0]
@@ -124,7 +128,7 @@ if period_type == "Monthly":
             x=["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"],
             y=[f"Week {i+1}" for i in range(len(month_days))],
             colorscale="Blues",
-            colorbar=dict(title="Amount (Rp)"),
+            colorbar=dict(title=f"Amount ({symbol})"),
             hoverinfo="z"
         )
     )
@@ -158,12 +162,13 @@ else:
             lambda x: x[x["category"] == "Income"]["amount"].sum() - x[x["category"] == "Expense"]["amount"].sum()
         )
     )
+    monthly_cashflow = from_minor_units(monthly_cashflow, base_currency)
     monthly_cashflow.index = [i.strftime("%B %Y") for i in monthly_cashflow.index]
     fig4 = px.line(
         x=monthly_cashflow.index,
         y=monthly_cashflow.values,
         markers=True,
-        labels={"x": "Month", "y": "Cashflow (Rp)"},
+        labels={"x": "Month", "y": f"Cashflow ({symbol})"},
         color_discrete_sequence=px.colors.diverging.RdBu_r
     )
     st.plotly_chart(fig4, use_container_width=True)
@@ -176,6 +181,7 @@ else:
         .reset_index()
     )
     monthly_summary["date"] = monthly_summary["date"].dt.to_timestamp()
+    monthly_summary["amount"] = from_minor_units(monthly_summary["amount"], base_currency)
     monthly_summary.rename(columns={"date": "Month", "category": "Category", "amount": "Amount"}, inplace=True)
     fig = px.bar(
         monthly_summary,
@@ -187,7 +193,7 @@ else:
     )
     fig.update_layout(
         xaxis_title="Month",
-        yaxis_title="Amount (Rp)",
+        yaxis_title=f"Amount ({symbol})",
         legend_title="Category",
     )
     st.plotly_chart(fig, use_container_width=True)
@@ -201,6 +207,7 @@ else:
         .unstack(fill_value=0)
         .reindex(columns=allowed_categories, fill_value=0)
     )
+    spend_by_cat = from_minor_units(spend_by_cat, base_currency)
     spend_by_cat.index = [i.strftime("%B %Y") for i in spend_by_cat.index]
     if not spend_by_cat.empty:
         spend_by_cat_reset = spend_by_cat.reset_index().rename(columns={"index": "Month"})
@@ -214,7 +221,7 @@ else:
             title=f"Yearly Expense Distribution by Category - {selected_year}",
             color_discrete_sequence=px.colors.sequential.RdBu_r
         )
-        fig5.update_layout(xaxis_title="Month", yaxis_title="Amount (Rp)", legend_title="Subcategory",)
+        fig5.update_layout(xaxis_title="Month", yaxis_title=f"Amount ({symbol})", legend_title="Subcategory",)
         st.plotly_chart(fig5, use_container_width=True)
     else:
         st.info("No expense data for this year.")
\ No newline at end of file